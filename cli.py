@@ -0,0 +1,29 @@
+"""
+Runs several commands in one process so they share a single Playwright driver.
+
+Usage:
+    python cli.py login send    # Log in, then send a test message right away
+"""
+
+import argparse
+import login
+import send_message
+
+
+COMMANDS = {
+    "login": login.main,
+    "send": send_message.main,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TikTok Streak commands")
+    parser.add_argument("commands", nargs="+", choices=list(COMMANDS),
+                        help="commands to run, in order")
+    args = parser.parse_args()
+    for name in args.commands:
+        COMMANDS[name]()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Clipboard helper shared by the setup scripts.
+
+On macOS the system pasteboard is written directly through pyobjc when it is
+installed; otherwise the platform's clipboard command is used.
+"""
+
+import platform
+import subprocess
+
+
+_CLIPBOARD_COMMANDS = {
+    "Darwin": ["pbcopy"],
+    "Linux": ["xclip", "-selection", "clipboard"],
+    "Windows": ["clip"],
+}
+
+# Lazily resolved (AppKit module, general pasteboard) pair; False once we
+# know pyobjc is unavailable so the import is not retried on every call.
+_pasteboard = None
+
+
+def _get_pasteboard():
+    global _pasteboard
+    if _pasteboard is None:
+        _pasteboard = False
+        if platform.system() == "Darwin":
+            try:
+                import AppKit
+            except ImportError:
+                pass
+            else:
+                _pasteboard = (AppKit, AppKit.NSPasteboard.generalPasteboard())
+    return _pasteboard
+
+
+def copy_to_clipboard(data):
+    """Copy a str or bytes value; bytes are handed to the clipboard as-is."""
+    is_bytes = isinstance(data, (bytes, bytearray))
+    pasteboard = _get_pasteboard()
+    if pasteboard:
+        AppKit, board = pasteboard
+        text = bytes(data).decode() if is_bytes else data
+        board.declareTypes_owner_([AppKit.NSPasteboardTypeString], None)
+        return bool(board.setString_forType_(text, AppKit.NSPasteboardTypeString))
+
+    command = _CLIPBOARD_COMMANDS.get(platform.system())
+    if command is None:
+        return False
+    try:
+        subprocess.run(command, input=data if is_bytes else data.encode(), check=True)
+        return True
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        return False
@@ -7,7 +7,16 @@ import os
 RECIPIENT = os.environ.get("TIKTOK_RECIPIENT", "")
 MESSAGE = os.environ.get("TIKTOK_MESSAGE", "hey :)")
 
+# Shared by login.py and send_message.py so the session is always used with
+# the same browser identity. Headless Chromium's own UA says "HeadlessChrome".
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/120.0.0.0 Safari/537.36"
+)
+
 # Local paths (not used in GitHub Actions)
 _DIR = os.path.dirname(os.path.abspath(__file__))
 PROFILE_DIR = os.path.join(_DIR, "browser_data")
 COOKIES_FILE = os.path.join(_DIR, "cookies.json")
+WORKER_SOCKET = os.path.join(_DIR, "worker.sock")
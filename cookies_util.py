@@ -0,0 +1,90 @@
+"""
+Helpers for encoding and decoding the TIKTOK_COOKIES session value.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import pybase64
+except ImportError:
+    import base64 as pybase64
+
+
+ESSENTIAL_COOKIES = frozenset({
+    "sessionid", "sessionid_ss", "sid_tt", "sid_guard",
+    "uid_tt", "uid_tt_ss", "sid_ucp_v1", "ssid_ucp_v1",
+    "tt_csrf_token", "passport_csrf_token", "passport_csrf_token_default",
+    "cmpl_token", "s_v_web_id", "ttwid", "odin_tt", "msToken",
+    "multi_sids", "tt_chain_token", "store-idc", "store-country-code",
+    "store-country-code-src", "tt-target-idc", "tt-target-idc-sign",
+    "store-country-sign", "passport_fe_beating_status",
+    "tt_session_tlb_tag", "last_login_method",
+})
+
+
+def b64encode(data):
+    """Base64-encode bytes and return the result as a str."""
+    if hasattr(pybase64, "b64encode_as_string"):
+        return pybase64.b64encode_as_string(data)
+    return pybase64.b64encode(data).decode("ascii")
+
+
+def b64decode(data):
+    """Decode a base64 str or bytes value."""
+    return pybase64.b64decode(data, validate=False)
+
+
+def dump_json(obj, indent=False, sort_keys=False):
+    """Serialize obj to UTF-8 JSON bytes."""
+    if orjson is not None:
+        option = 0
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, indent=2, sort_keys=sort_keys).encode()
+    return json.dumps(obj, separators=(",", ":"), sort_keys=sort_keys).encode()
+
+
+def load_json(data):
+    """Parse JSON from a str or UTF-8 bytes value."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode_cookies(storage):
+    """Encode only essential cookies to keep the value under GitHub's 64KB secret limit."""
+    trimmed = {
+        "cookies": [c for c in storage["cookies"] if c["name"] in ESSENTIAL_COOKIES],
+        "origins": [],
+    }
+    return b64encode(dump_json(trimmed))
+
+
+def write_if_changed(path, data):
+    """Write bytes to path unless the file already holds exactly those bytes.
+
+    The write goes to a temporary file that is then renamed over path, so a
+    crash mid-write never leaves a truncated file behind. Returns True if the
+    file was written.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
@@ -0,0 +1,47 @@
+"""
+Decodes the TIKTOK_COOKIES_B64 secret once at the start of a CI job.
+
+Writes the decoded storage_state to a file and, on GitHub Actions, exports
+TIKTOK_COOKIES_FILE to later steps so send_message.py reads the file instead
+of decoding the secret again.
+
+Usage:
+    TIKTOK_COOKIES_B64=... python decode_once.py [path]
+"""
+
+import os
+import sys
+import tempfile
+from cookies_util import b64decode, load_json
+
+
+def main():
+    cookies_b64 = os.environ.get("TIKTOK_COOKIES_B64")
+    if not cookies_b64:
+        print("ERROR: TIKTOK_COOKIES_B64 is not set.")
+        sys.exit(1)
+
+    if len(sys.argv) > 1:
+        path = sys.argv[1]
+    else:
+        tmp_dir = os.environ.get("RUNNER_TEMP") or tempfile.gettempdir()
+        path = os.path.join(tmp_dir, "tiktok-cookies.json")
+
+    data = b64decode(cookies_b64)
+    # Fail here, not halfway through sending, if the secret is malformed
+    load_json(data)
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+
+    github_env = os.environ.get("GITHUB_ENV")
+    if github_env:
+        with open(github_env, "a") as f:
+            f.write(f"TIKTOK_COOKIES_FILE={path}\n")
+
+    print(f"Decoded cookies written to {path}")
+
+
+if __name__ == "__main__":
+    main()
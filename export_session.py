@@ -5,18 +5,9 @@ Usage:
     python export_session.py
 """
 
-import base64
-import json
-import subprocess
+from clipboard import copy_to_clipboard
 from config import COOKIES_FILE
-
-
-def copy_to_clipboard(text):
-    try:
-        subprocess.run(["pbcopy"], input=text.encode(), check=True)
-        return True
-    except (FileNotFoundError, subprocess.CalledProcessError):
-        return False
+from cookies_util import dump_json, encode_cookies
 
 
 def main():
@@ -66,10 +57,10 @@ def main():
         "origins": [],
     }
 
-    with open(COOKIES_FILE, "w") as f:
-        json.dump(storage, f, indent=2)
+    with open(COOKIES_FILE, "wb") as f:
+        f.write(dump_json(storage, indent=True))
 
-    cookies_b64 = base64.b64encode(json.dumps(storage).encode()).decode()
+    cookies_b64 = encode_cookies(storage)
 
     print()
     if copy_to_clipboard(cookies_b64):
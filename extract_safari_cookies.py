@@ -8,31 +8,34 @@ Note: macOS may prompt you to grant Full Disk Access or a similar permission
 for Terminal/iTerm to read Safari's cookie database.
 """
 
-import base64
-import json
+import os
 import platform
 import shutil
 import sqlite3
+import struct
 import subprocess
 import tempfile
+from clipboard import copy_to_clipboard
 from config import COOKIES_FILE
+from cookies_util import dump_json, encode_cookies
 
 
-SAFARI_COOKIES_DB = (
-    "/Users/{user}/Library/Containers/com.apple.Safari/Data/Library/Cookies/Cookies.binarycookies"
-)
-# Safari also stores cookies in a sqlite database
-SAFARI_COOKIES_SQLITE = (
-    "/Users/{user}/Library/Cookies/Cookies.binarycookies"
-)
+# Sandboxed Safari (macOS 10.14+) first, then the older location
+SAFARI_COOKIES_FILES = [
+    os.path.expanduser(
+        "~/Library/Containers/com.apple.Safari/Data/Library/Cookies/Cookies.binarycookies"
+    ),
+    os.path.expanduser("~/Library/Cookies/Cookies.binarycookies"),
+]
 
+# Binarycookies timestamps count seconds from 2001-01-01 (the Mac epoch)
+MAC_EPOCH_OFFSET = 978307200
 
-def copy_to_clipboard(text):
-    try:
-        subprocess.run(["pbcopy"], input=text.encode(), check=True)
-        return True
-    except (FileNotFoundError, subprocess.CalledProcessError):
-        return False
+# Cookie record header: size, ?, flags, ?, domain/name/path/value offsets,
+# 8-byte end marker, expiry and creation dates
+_COOKIE_RECORD = struct.Struct("<8i8x2d")
+_FLAG_SECURE = 0x1
+_FLAG_HTTP_ONLY = 0x4
 
 
 def extract_via_javascript():
@@ -58,6 +61,59 @@ def extract_via_javascript():
     return result.stdout.strip()
 
 
+def parse_binarycookies(path, domain="tiktok.com"):
+    """Read Safari's Cookies.binarycookies file into Playwright storage_state format.
+
+    Unlike document.cookie this includes HttpOnly cookies such as sessionid.
+    Returns None if the file can't be read or isn't a binarycookies file.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if data[:4] != b"cook":
+        return None
+
+    cookies = []
+    try:
+        num_pages = struct.unpack_from(">i", data, 4)[0]
+        page_sizes = struct.unpack_from(f">{num_pages}i", data, 8)
+        page_start = 8 + 4 * num_pages
+        for page_size in page_sizes:
+            page = data[page_start:page_start + page_size]
+            page_start += page_size
+            num_cookies = struct.unpack_from("<i", page, 4)[0]
+            for offset in struct.unpack_from(f"<{num_cookies}i", page, 8):
+                cookie = _parse_cookie_record(page, offset)
+                if cookie["domain"].endswith(domain):
+                    cookies.append(cookie)
+    except (struct.error, ValueError):
+        return None
+    return {"cookies": cookies, "origins": []}
+
+
+def _parse_cookie_record(page, start):
+    (_, _, flags, _, domain_off, name_off, path_off, value_off,
+     expires, _) = _COOKIE_RECORD.unpack_from(page, start)
+    secure = bool(flags & _FLAG_SECURE)
+    return {
+        "name": _read_cstring(page, start + name_off),
+        "value": _read_cstring(page, start + value_off),
+        "domain": _read_cstring(page, start + domain_off),
+        "path": _read_cstring(page, start + path_off),
+        "expires": expires + MAC_EPOCH_OFFSET,
+        "httpOnly": bool(flags & _FLAG_HTTP_ONLY),
+        "secure": secure,
+        "sameSite": "None" if secure else "Lax",
+    }
+
+
+def _read_cstring(buf, start):
+    end = buf.index(b"\0", start)
+    return buf[start:end].decode("utf-8", "replace")
+
+
 def parse_cookie_string(cookie_str):
     """Convert a document.cookie string into Playwright storage_state format."""
     cookies = []
@@ -83,18 +139,31 @@ def main():
     print("=" * 60)
     print()
     print("Make sure you're logged into TikTok in Safari.")
-    print("This will briefly use Safari to grab your session cookies.")
     print()
 
-    cookie_str = extract_via_javascript()
-    if not cookie_str:
-        print("ERROR: Could not extract cookies from Safari.")
-        print("Make sure Safari is open and you're logged into TikTok.")
-        print("You may need to allow Terminal access in:")
-        print("  System Settings → Privacy & Security → Automation")
-        return
-
-    storage = parse_cookie_string(cookie_str)
+    storage = None
+    for path in SAFARI_COOKIES_FILES:
+        storage = parse_binarycookies(path)
+        # A readable file with no TikTok cookies (e.g. a stale legacy file)
+        # doesn't count; try the next one
+        if storage and storage["cookies"]:
+            break
+    else:
+        storage = None
+
+    if storage is None:
+        # No readable cookie file with TikTok cookies (e.g. no Full Disk
+        # Access) — ask Safari instead
+        print("Could not read TikTok cookies from Safari's cookie file, using Safari to grab cookies...")
+        cookie_str = extract_via_javascript()
+        if not cookie_str:
+            print("ERROR: Could not extract cookies from Safari.")
+            print("Make sure Safari is open and you're logged into TikTok.")
+            print("You may need to allow Terminal access in:")
+            print("  System Settings → Privacy & Security → Full Disk Access")
+            print("  or System Settings → Privacy & Security → Automation")
+            return
+        storage = parse_cookie_string(cookie_str)
 
     if not storage["cookies"]:
         print("ERROR: No cookies found. Make sure you're logged into TikTok in Safari.")
@@ -102,10 +171,10 @@ def main():
 
     print(f"Extracted {len(storage['cookies'])} cookies from Safari.")
 
-    with open(COOKIES_FILE, "w") as f:
-        json.dump(storage, f, indent=2)
+    with open(COOKIES_FILE, "wb") as f:
+        f.write(dump_json(storage, indent=True))
 
-    cookies_b64 = base64.b64encode(json.dumps(storage).encode()).decode()
+    cookies_b64 = encode_cookies(storage)
 
     print()
     print("=" * 60)
@@ -0,0 +1,28 @@
+"""
+Lazily started Playwright driver shared by every script in the process.
+
+Starting Playwright spawns its Node driver process. When several commands run
+in one Python process (see cli.py) they all reuse the same driver.
+"""
+
+import atexit
+
+
+_playwright = None
+
+
+def get():
+    """Return the shared Playwright instance, starting it on first use."""
+    global _playwright
+    if _playwright is None:
+        from playwright.sync_api import sync_playwright
+        _playwright = sync_playwright().start()
+        atexit.register(_stop)
+    return _playwright
+
+
+def _stop():
+    global _playwright
+    if _playwright is not None:
+        _playwright.stop()
+        _playwright = None
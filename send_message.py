@@ -3,9 +3,12 @@ Sends a TikTok DM to maintain a streak.
 Uses saved session cookies to avoid needing to log in each time.
 
 Usage:
-    python send_message.py           # Uses cookies.json from disk
+    python send_message.py           # Uses the login.py browser profile, or cookies.json
     TIKTOK_COOKIES_B64=... python send_message.py  # Uses base64-encoded cookies from env
 
+If tiktok_worker.py is running, the message is sent through it instead of
+starting a browser here.
+
 All config is read from environment variables (see README).
 
 TIKTOK_RECIPIENT format: "DisplayName" or "DisplayName|@username"
@@ -13,166 +16,313 @@ TIKTOK_RECIPIENT format: "DisplayName" or "DisplayName|@username"
   - If not found and @username is provided, uses search to find them
 """
 
-import base64
-import json
 import os
+import shutil
+import socket
 import sys
-from datetime import datetime
-from playwright.sync_api import sync_playwright
-from playwright_stealth import Stealth
-from config import RECIPIENT, MESSAGE, COOKIES_FILE
-
-
-def log(msg):
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {msg}")
-
-
-def load_cookies():
-    """Load cookies from base64 env var (GitHub Actions) or local file."""
-    cookies_b64 = os.environ.get("TIKTOK_COOKIES_B64")
-    if cookies_b64:
-        log("Loading cookies from TIKTOK_COOKIES_B64 environment variable")
-        return json.loads(base64.b64decode(cookies_b64).decode("utf-8"))
+from concurrent.futures import ThreadPoolExecutor
+import playwright_driver
+from config import RECIPIENT, MESSAGE, COOKIES_FILE, PROFILE_DIR, USER_AGENT, WORKER_SOCKET
+from cookies_util import dump_json, load_json, write_if_changed
+from tiktok_session import cookies_from_env, load_cookies, log
+
+
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1280, "height": 800},
+    "user_agent": USER_AGENT,
+}
+
+# Seconds to wait for tiktok_worker.py to finish a job; above the few minutes
+# a send takes when every navigation and wait in it runs to its timeout
+WORKER_TIMEOUT = 300
+
+# Headless tuning for CI containers: keep shared memory in /tmp (/dev/shm is
+# tiny on runners) and skip GPU and sync start-up. Playwright already passes
+# --no-sandbox, --disable-extensions and --disable-background-networking.
+CHROMIUM_ARGS = [
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-sync",
+]
+
+# Loads the DM flow never needs: images (avatars, emoji sprites, thumbnails)
+# and TikTok's monitoring beacons. Blocked by Chromium itself rather than with
+# context.route, which would turn off the profile's HTTP cache and send every
+# request through Python. Playwright passes its own --blink-settings in
+# headless mode and only the last one counts, so its pointer settings are
+# repeated here.
+BLOCKING_ARGS = [
+    "--blink-settings=imagesEnabled=false,primaryHoverType=2,availableHoverTypes=2,"
+    "primaryPointerType=4,availablePointerTypes=4",
+    "--host-resolver-rules=MAP mon*.tiktokv.com ~NOTFOUND",
+]
+
+SEARCH_BUTTON_SEL = (
+    '[data-e2e="search-icon"], '
+    'svg[data-icon="search"], '
+    'button[aria-label*="Search"], '
+    '[class*="search"] svg, '
+    'a[href*="search"]'
+)
+SEARCH_INPUT_SEL = (
+    '[data-e2e="search-input"], '
+    'input[placeholder*="Search"], '
+    'input[type="search"], '
+    'input[aria-label*="Search"]'
+)
+MESSAGE_INPUT_SEL = (
+    '[data-e2e="message-input"], '
+    '[contenteditable="true"], '
+    'div[role="textbox"]'
+)
+SEND_BUTTON_SEL = '[data-e2e="message-send"], button[aria-label="Send"]'
+SEARCH_RESULTS_SEL = '[data-e2e="search-results"]'
+PROFILE_MESSAGE_BUTTON_SEL = '[data-e2e="message-button"], button:text-is("Message")'
+
+CONVERSATION_ITEM_SEL = (
+    '[data-e2e="chat-list-item"], '
+    '[data-e2e^="chat-list"] > div, '
+    '[data-e2e*="conversation"], '
+    '[class*="ConversationItem"], '
+    'a[href*="/messages/"]'
+)
+
+# The conversation list itself (not its rows); text lookups are scoped to it
+# so they don't walk the nav and the open conversation as well
+CHAT_LIST_SEL = '[data-e2e^="chat-list"]:not([data-e2e="chat-list-item"])'
+
+MESSAGES_READY_SEL = '[data-e2e*="chat-list"]'
+
+# True once the messages page has rendered its shell, or the session turned
+# out to be expired and TikTok redirected to the login page.
+MESSAGES_READY_JS = """(selector) =>
+    location.pathname.startsWith("/login") || document.querySelector(selector) !== null"""
+
+# Finds the conversation for a display name and clicks it, all in the page.
+# Looks inside the conversation list (CHAT_LIST_SEL) first and then in the
+# whole document. Prefers a small element (span/p/div) whose text is exactly
+# the name, then falls back to a link or button containing it. Used as a
+# polled wait_for_function predicate: when the name isn't rendered yet, it
+# scrolls every scrollable container (the conversation list is one of them)
+# a step so the next poll can see the rows that load in.
+FIND_CONVERSATION_JS = """([name, listSelector]) => {
+    const visible = (el) => el.getClientRects().length > 0;
+    const open = (el) => {
+        el.scrollIntoView({ block: "center" });
+        el.click();
+        return true;
+    };
+    // One pass over root: an exact match wins immediately, the first
+    // link/button containing the name is kept as the fallback
+    const find = (root) => {
+        let partial = null;
+        for (const el of root.querySelectorAll('span, p, div, a, [role="button"]')) {
+            if (!visible(el)) continue;
+            // SVG links and buttons have no innerText
+            const text = el.innerText || "";
+            if (el.matches("span, p, div") && text.trim() === name) return el;
+            if (!partial && el.matches('a, [role="button"]') && text.includes(name)) {
+                partial = el;
+            }
+        }
+        return partial;
+    };
+    // The list selector is a guess, so search the whole document as well
+    // when the scoped pass finds nothing
+    const list = document.querySelector(listSelector);
+    const match = (list && find(list)) || find(document);
+    if (match) return open(match);
+
+    // Finding the scrollers walks every element, so the list is cached. It is
+    // rebuilt only when none of the cached containers is still in the page
+    // and overflowing (e.g. the conversation list hadn't overflowed yet when
+    // the list was built), not merely because they all reached the bottom.
+    const page = document.scrollingElement;
+    const usable = (el) => el !== page && el.isConnected && el.scrollHeight > el.clientHeight;
+    if (!window.__streakScrollers || !window.__streakScrollers.some(usable)) {
+        window.__streakScrollers = [...document.querySelectorAll("*")].filter((el) => {
+            const overflow = getComputedStyle(el).overflowY;
+            return (overflow === "auto" || overflow === "scroll")
+                && el.scrollHeight > el.clientHeight;
+        }).concat(page || []);
+    }
+    for (const el of window.__streakScrollers) el.scrollTop += 500;
+    return false;
+}"""
+
+# True once the open conversation belongs to the given username: the URL
+# names them, or a visible link points at their profile (the thread header
+# links to the other person). Guards the profile shortcut against having
+# opened some other DM.
+CONVERSATION_WITH_JS = """(username) => {
+    const profile = "/@" + username.toLowerCase();
+    if (decodeURIComponent(location.href).toLowerCase().includes(profile)) return true;
+    return [...document.querySelectorAll('a[href*="/@"]')].some((a) =>
+        a.getClientRects().length > 0
+        && decodeURIComponent(a.pathname).toLowerCase().replace(/\/$/, "") === profile);
+}"""
+
+# Clicks the send button (SEND_BUTTON_SEL, or a button labelled "Send") once
+# it is rendered; used as a wait_for_function predicate so finding and
+# clicking it is a single round trip.
+CLICK_SEND_JS = """(selector) => {
+    const visible = (el) => el.getClientRects().length > 0;
+    const button = [...document.querySelectorAll(selector)].find(visible)
+        || [...document.querySelectorAll("button")]
+            .find((el) => visible(el) && el.innerText.trim() === "Send");
+    if (!button) return false;
+    button.click();
+    return true;
+}"""
+
+# Focuses the message box and replaces its contents in one round trip.
+# Selecting everything first makes the insert overwrite a leftover draft, as
+# fill() did. insertText goes through the browser's editing pipeline, so
+# TikTok's React editor sees a real input event; returns false if the
+# browser refused the command.
+INSERT_TEXT_JS = """(el, msg) => {
+    el.focus();
+    document.execCommand("selectAll");
+    return document.execCommand("insertText", false, msg);
+}"""
+
+# Counts visible message bubbles (elements outside the input box) whose text
+# is exactly the message. The streak message repeats daily, so a send is
+# confirmed by the count going up rather than by the text being present.
+COUNT_MESSAGE_JS = """(msg) => {
+    let count = 0;
+    for (const el of document.querySelectorAll("span, p, div")) {
+        if (el.closest('[contenteditable="true"], [role="textbox"]')) continue;
+        if (el.getClientRects().length > 0 && el.innerText.trim() === msg) {
+            count++;
+        }
+    }
+    return count;
+}"""
+MESSAGE_SENT_JS = f"""([msg, before]) => ({COUNT_MESSAGE_JS})(msg) > before"""
+
+
+def save_debug_screenshot(page, name, failure=False):
+    """Save a screenshot for debugging failures.
+
+    Screenshots of the happy path are only taken when TIKTOK_DEBUG is set.
+    """
+    if not failure and not os.environ.get("TIKTOK_DEBUG"):
+        return
+    try:
+        path = f"/tmp/{name}.jpg"
+        meta = page.evaluate("() => ({ url: location.href, title: document.title })")
+        page.screenshot(path=path, type="jpeg", quality=60)
+        log(f"Debug screenshot saved to {path}")
+        log(f"Current URL: {meta['url']}")
+        log(f"Page title: {meta['title']}")
+    except Exception as e:
+        log(f"Could not save screenshot: {e}")
 
-    if os.path.exists(COOKIES_FILE):
-        log(f"Loading cookies from {COOKIES_FILE}")
-        with open(COOKIES_FILE) as f:
-            return json.load(f)
 
-    log("ERROR: No cookies found.")
-    log("  Run `python login.py` first, then copy your cookies to GitHub Secrets.")
-    log("  See README for full instructions.")
-    sys.exit(1)
+def check_logged_in(page):
+    """Raise SendError if TikTok redirected to the login page."""
+    if "/login" in page.url:
+        save_debug_screenshot(page, "login-redirect", failure=True)
+        raise SendError("Session expired. Re-run login.py and update TIKTOK_COOKIES secret.")
 
 
-def save_debug_screenshot(page, name):
-    """Save a screenshot for debugging CI failures."""
+def open_messages_page(page):
+    """Navigate to the messages page and make sure the session is still valid."""
+    log("Navigating to TikTok messages...")
+    page.goto("https://www.tiktok.com/messages", wait_until="domcontentloaded")
     try:
-        path = f"/tmp/{name}.png"
-        page.screenshot(path=path)
-        log(f"Debug screenshot saved to {path}")
-        log(f"Current URL: {page.url}")
-        log(f"Page title: {page.title()}")
-    except Exception as e:
-        log(f"Could not save screenshot: {e}")
+        page.wait_for_function(MESSAGES_READY_JS, arg=MESSAGES_READY_SEL, timeout=15000)
+    except Exception:
+        log("WARNING: Messages page did not finish rendering")
+    check_logged_in(page)
 
 
 def wait_for_conversations_to_load(page):
     """Wait for the conversation list to finish loading."""
     log("Waiting for conversations to load...")
-    for attempt in range(15):
-        page.wait_for_timeout(2000)
-        body_text = page.locator("body").inner_text()
-        lines = [l.strip() for l in body_text.split("\n") if l.strip()]
-        non_nav = [l for l in lines if l not in (
-            "TikTok", "For You", "Shop", "Explore", "Following", "Friends",
-            "LIVE", "Messages", "Activity", "Upload", "Profile", "More",
-            "Post video", ""
-        ) and not l.isdigit()]
-        if len(non_nav) > 3:
-            log(f"Conversations loaded (attempt {attempt + 1})")
-            return True
-        log(f"Still loading... (attempt {attempt + 1})")
-    log("WARNING: Conversations may not have fully loaded")
-    return False
+    try:
+        page.locator(CONVERSATION_ITEM_SEL).first.wait_for(state="visible", timeout=20000)
+    except Exception:
+        log("WARNING: Conversations may not have fully loaded")
+        return False
+    log("Conversations loaded")
+    return True
 
 
 def find_in_conversation_list(page, display_name):
     """Try to find and click a conversation by display name (with scrolling)."""
     log(f"Looking for '{display_name}' in conversation list...")
+    try:
+        page.wait_for_function(
+            FIND_CONVERSATION_JS, arg=[display_name, CHAT_LIST_SEL], polling=200, timeout=15000
+        )
+    except Exception:
+        return False
+    log("Found conversation and clicked it")
+    return True
 
-    for scroll_attempt in range(5):
-        # Strategy 1: Find text that exactly matches or starts with the display name
-        # This should find the name element in the conversation item
-        try:
-            # Look for a span/p/div that contains just the name (not a huge container)
-            name_element = page.locator(f'span:text-is("{display_name}"), p:text-is("{display_name}")').first
-            name_element.wait_for(state="visible", timeout=3000)
-            log(f"Found exact name element, clicking...")
-            name_element.click()
-            page.wait_for_timeout(3000)
-            return True
-        except Exception:
-            pass
-
-        # Strategy 2: Look for links or clickable items containing the name
-        try:
-            link = page.locator(f'a:has-text("{display_name}"), [role="button"]:has-text("{display_name}")').first
-            link.wait_for(state="visible", timeout=2000)
-            log(f"Found link/button with name, clicking...")
-            link.click()
-            page.wait_for_timeout(3000)
-            return True
-        except Exception:
-            pass
-
-        # Strategy 3: Get by text with exact match
-        try:
-            elem = page.get_by_text(display_name, exact=True).first
-            elem.wait_for(state="visible", timeout=2000)
-            log(f"Found via get_by_text exact, clicking...")
-            elem.click()
-            page.wait_for_timeout(3000)
-            return True
-        except Exception:
-            pass
-
-        # Scroll and try again
-        if scroll_attempt < 4:
-            log(f"Not found, scrolling... (attempt {scroll_attempt + 1})")
-            page.mouse.wheel(0, 500)
-            page.wait_for_timeout(1500)
 
-    return False
+def open_from_profile(page, username_clean):
+    """Open the DM with a user through the Message button on their profile page."""
+    log(f"Opening @{username_clean}'s profile...")
+    try:
+        page.goto(f"https://www.tiktok.com/@{username_clean}", wait_until="domcontentloaded")
+        message_button = page.locator(PROFILE_MESSAGE_BUTTON_SEL).first
+        message_button.wait_for(state="visible", timeout=8000)
+        message_button.click()
+        page.locator(MESSAGE_INPUT_SEL).last.wait_for(state="visible", timeout=10000)
+        page.wait_for_function(CONVERSATION_WITH_JS, arg=username_clean, timeout=5000)
+    except Exception as e:
+        log(f"Profile shortcut failed: {e}")
+        return False
+    log("Opened conversation from profile")
+    return True
 
 
 def search_for_user(page, username):
-    """Use the search feature in messages to find a user by username."""
+    """Open the conversation with a user by username.
+
+    Goes through the user's profile page first, and falls back to the search
+    feature in messages.
+    """
     username_clean = username.lstrip("@")
+    if open_from_profile(page, username_clean):
+        return True
+
+    open_messages_page(page)
     log(f"Searching for @{username_clean} using search...")
 
     # Click the search icon in the left sidebar
-    search_button = page.locator(
-        '[data-e2e="search-icon"], '
-        'svg[data-icon="search"], '
-        'button[aria-label*="Search"], '
-        '[class*="search"] svg, '
-        'a[href*="search"]'
-    ).first
+    search_button = page.locator(SEARCH_BUTTON_SEL).first
 
     try:
         search_button.wait_for(state="visible", timeout=5000)
         search_button.click()
-        page.wait_for_timeout(2000)
     except Exception:
         log("Could not find search button, trying search input directly...")
 
     # Look for search input
-    search_input = page.locator(
-        '[data-e2e="search-input"], '
-        'input[placeholder*="Search"], '
-        'input[type="search"], '
-        'input[aria-label*="Search"]'
-    ).first
+    search_input = page.locator(SEARCH_INPUT_SEL).first
 
     try:
         search_input.wait_for(state="visible", timeout=5000)
         search_input.click()
         search_input.fill(username_clean)
-        page.wait_for_timeout(2000)
-
-        # Press enter or wait for results
         search_input.press("Enter")
-        page.wait_for_timeout(3000)
 
-        save_debug_screenshot(page, "search-results")
-
-        # Look for the user in search results and click
-        result = page.get_by_text(username_clean, exact=False).first
+        # Look for the user in search results and click, staying inside the
+        # results panel when TikTok renders one. Wait for the panel or the
+        # name to show up first so the panel isn't checked before it renders.
+        results = page.locator(SEARCH_RESULTS_SEL)
+        matches = page.get_by_text(username_clean, exact=False)
+        results.or_(matches).first.wait_for(state="visible", timeout=5000)
+        scope = results.first if results.count() else page
+        result = scope.get_by_text(username_clean, exact=False).first
         result.wait_for(state="visible", timeout=5000)
+        save_debug_screenshot(page, "search-results")
         result.click()
-        page.wait_for_timeout(3000)
 
         return True
     except Exception as e:
@@ -180,123 +330,213 @@ def search_for_user(page, username):
         return False
 
 
-def main():
-    if not RECIPIENT:
-        log("ERROR: TIKTOK_RECIPIENT is not set.")
-        log("  Set it as a GitHub Actions secret or environment variable.")
-        log("  Format: 'DisplayName' or 'DisplayName|@username'")
-        sys.exit(1)
+class SendError(Exception):
+    """The message could not be sent; the message says why."""
+
+
+def parse_recipient(recipient):
+    """Split "DisplayName", "@username" or "DisplayName|@username" into (display_name, username)."""
+    if "|" in recipient:
+        display_name, username = recipient.split("|", 1)
+        return display_name.strip(), username.strip()
+    if recipient.startswith("@"):
+        return None, recipient
+    return recipient, None
+
+
+def open_context():
+    """Launch the persistent browser profile, seeded with cookies when needed.
+
+    Returns (context, storage_state); storage_state is the loaded cookies, or
+    None when the profile's own session was used.
+    """
+    # Always run in the persistent browser profile so its HTTP cache and
+    # compiled JS carry over between runs. The session itself is seeded from
+    # the cookies whenever there are any: cookies supplied through the
+    # environment (CI), or a cookies.json that export_session.py or
+    # extract_safari_cookies.py may have refreshed since the profile was made.
+    # Only a profile with no cookies to seed it is trusted on its own.
+    fresh_profile = not os.path.isdir(PROFILE_DIR)
+    seed_cookies = fresh_profile or cookies_from_env() or os.path.exists(COOKIES_FILE)
+    storage_state = None
+
+    p = playwright_driver.get()
+    if not fresh_profile:
+        log(f"Using browser profile {PROFILE_DIR}")
+    # Decode the cookies on a worker thread while Chromium starts up
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        cookies_future = pool.submit(load_cookies) if seed_cookies else None
+        context = p.chromium.launch_persistent_context(
+            PROFILE_DIR, headless=True, args=CHROMIUM_ARGS + BLOCKING_ARGS, **CONTEXT_OPTIONS
+        )
+    if cookies_future is not None:
+        try:
+            storage_state = cookies_future.result()
+        except SystemExit:
+            # Don't leave behind an empty profile that later runs would trust
+            context.close()
+            if fresh_profile:
+                shutil.rmtree(PROFILE_DIR, ignore_errors=True)
+            raise
+        context.add_cookies(storage_state["cookies"])
+    return context, storage_state
 
-    # Parse recipient - can be "DisplayName" or "DisplayName|@username"
-    if "|" in RECIPIENT:
-        display_name, username = RECIPIENT.split("|", 1)
-        display_name = display_name.strip()
-        username = username.strip()
-    elif RECIPIENT.startswith("@"):
-        display_name = None
-        username = RECIPIENT
-    else:
-        display_name = RECIPIENT
-        username = None
 
-    log(f"Sending message: {MESSAGE}")
+def save_cookies(context, storage_state):
+    """Save updated cookies locally (in case the session was refreshed)."""
+    if storage_state is not None and not cookies_from_env():
+        updated_storage = context.storage_state()
+        write_if_changed(COOKIES_FILE, dump_json(updated_storage, sort_keys=True))
+
+
+def send(context, recipient, message):
+    """Send message to recipient in a new page of context. Raises SendError on failure."""
+    display_name, username = parse_recipient(recipient)
+
+    log(f"Sending message: {message}")
     if display_name:
         log(f"  Display name: {display_name}")
     if username:
         log(f"  Username: {username}")
 
-    storage_state = load_cookies()
-
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(
-            storage_state=storage_state,
-            viewport={"width": 1280, "height": 800},
-            user_agent=(
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Safari/537.36"
-            ),
-        )
-        stealth = Stealth()
-        page = context.new_page()
-        stealth.apply_stealth_sync(page)
+    page = context.new_page()
+    try:
+        _send_in_page(page, display_name, username, message)
+    finally:
+        page.close()
 
-        # Navigate to messages
-        log("Navigating to TikTok messages...")
-        page.goto("https://www.tiktok.com/messages", wait_until="networkidle")
-        page.wait_for_timeout(3000)
 
-        # Check if logged in
-        if "/login" in page.url:
-            save_debug_screenshot(page, "login-redirect")
-            log("ERROR: Session expired. Re-run login.py and update TIKTOK_COOKIES secret.")
-            browser.close()
-            sys.exit(1)
+def _send_in_page(page, display_name, username, message):
+    # Stealth's init scripts are only needed when we may fall back to the
+    # search flow; the conversation list opens fine on the session cookies
+    if username:
+        from playwright_stealth import Stealth
+        stealth = Stealth()
+        stealth.apply_stealth_sync(page)
 
+    found = False
+    if display_name:
+        # Strategy 1: Try to find by display name in conversation list
+        open_messages_page(page)
         wait_for_conversations_to_load(page)
         save_debug_screenshot(page, "messages-page")
+        found = find_in_conversation_list(page, display_name)
 
-        # Strategy 1: Try to find by display name in conversation list
-        found = False
-        if display_name:
-            found = find_in_conversation_list(page, display_name)
-
-        # Strategy 2: If not found, try search with username
+        # Strategy 2: If not found, try the username
         if not found and username:
-            log("Display name not found in list, trying search...")
+            log("Display name not found in list, trying username...")
             found = search_for_user(page, username)
+    else:
+        # Username only: search_for_user starts on the profile page and only
+        # loads the messages page if it has to fall back to search
+        found = search_for_user(page, username)
+
+    if not found:
+        # The redirect to the login page can land after the first check
+        check_logged_in(page)
+        save_debug_screenshot(page, "conversation-not-found", failure=True)
+        try:
+            # Slice in the page so only the preview crosses the wire
+            body_text = page.evaluate("() => document.body.innerText.slice(0, 1000)")
+            log(f"Page text preview (first 1000 chars):\n{body_text}")
+        except Exception:
+            pass
+        raise SendError(
+            "Could not find conversation.\n"
+            "  Make sure the display name or username is correct."
+        )
 
-        if not found:
-            save_debug_screenshot(page, "conversation-not-found")
-            try:
-                body_text = page.locator("body").inner_text()
-                log(f"Page text preview (first 1000 chars):\n{body_text[:1000]}")
-            except Exception:
-                pass
-            log(f"ERROR: Could not find conversation.")
-            log("  Make sure the display name or username is correct.")
-            browser.close()
-            sys.exit(1)
+    # Wait for the conversation to open, then type the message
+    message_input = page.locator(MESSAGE_INPUT_SEL).last
+    message_input.wait_for(state="visible", timeout=10000)
+    save_debug_screenshot(page, "conversation-opened")
 
-        save_debug_screenshot(page, "conversation-opened")
-
-        # Find the message input and type the message
-        log("Typing message...")
-        message_input = page.locator(
-            '[data-e2e="message-input"], '
-            '[contenteditable="true"], '
-            'div[role="textbox"]'
-        ).last
-        message_input.wait_for(state="visible", timeout=10000)
-        message_input.click()
-        message_input.fill(MESSAGE)
-        page.wait_for_timeout(500)
-
-        # Send the message
-        log("Sending message...")
-        send_button = page.locator(
-            '[data-e2e="message-send"], '
-            'button[aria-label="Send"], '
-            'button:has-text("Send")'
-        ).first
+    log("Typing message...")
+    if not message_input.evaluate(INSERT_TEXT_JS, message):
+        message_input.fill(message)
+
+    # Send the message
+    log("Sending message...")
+    sent_before = page.evaluate(COUNT_MESSAGE_JS, message)
+    try:
+        page.wait_for_function(CLICK_SEND_JS, arg=SEND_BUTTON_SEL, timeout=3000)
+    except Exception:
+        message_input.press("Enter")
+
+    try:
+        page.wait_for_function(
+            MESSAGE_SENT_JS, arg=[message, sent_before], polling=250, timeout=5000
+        )
+    except Exception:
+        log("WARNING: Sent message did not appear in the conversation")
+
+    save_debug_screenshot(page, "message-sent")
+
+
+def send_via_worker(recipient, message):
+    """Hand the job to a running tiktok_worker.py.
+
+    Returns the worker's reply ({"ok": ..., "error": ...}), or None when no
+    worker is listening on WORKER_SOCKET. A worker that doesn't answer within
+    WORKER_TIMEOUT seconds, or dies mid-job, is reported as a failed reply:
+    it still holds the browser profile and may still send the message, so
+    sending here as well is never safe.
+    """
+    if not os.path.exists(WORKER_SOCKET):
+        return None
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(WORKER_TIMEOUT)
         try:
-            send_button.wait_for(state="visible", timeout=3000)
-            send_button.click()
-        except Exception:
-            message_input.press("Enter")
+            sock.connect(WORKER_SOCKET)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Stale socket file left behind by a worker that died
+            return None
+        log(f"Sending through worker at {WORKER_SOCKET}")
+        try:
+            sock.sendall(dump_json({"recipient": recipient, "message": message}))
+            sock.shutdown(socket.SHUT_WR)
+            return load_json(read_all(sock))
+        except socket.timeout:
+            return {"ok": False, "error": f"Worker did not answer within {WORKER_TIMEOUT}s"}
+        except (OSError, ValueError) as e:
+            return {"ok": False, "error": f"Worker failed without a reply: {e!r}"}
+
+
+def read_all(sock):
+    """Read from sock until the peer closes its end."""
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
 
-        page.wait_for_timeout(2000)
 
-        save_debug_screenshot(page, "message-sent")
+def main():
+    if not RECIPIENT:
+        log("ERROR: TIKTOK_RECIPIENT is not set.")
+        log("  Set it as a GitHub Actions secret or environment variable.")
+        log("  Format: 'DisplayName' or 'DisplayName|@username'")
+        sys.exit(1)
 
-        # Save updated cookies locally (in case session was refreshed)
-        if not os.environ.get("TIKTOK_COOKIES_B64"):
-            updated_storage = context.storage_state()
-            with open(COOKIES_FILE, "w") as f:
-                json.dump(updated_storage, f, indent=2)
+    # A running worker already holds Playwright and the browser profile
+    reply = send_via_worker(RECIPIENT, MESSAGE)
+    if reply is not None:
+        if not reply["ok"]:
+            log(f"ERROR: {reply['error']}")
+            sys.exit(1)
+        log("Message sent successfully!")
+        return
 
-        browser.close()
+    context, storage_state = open_context()
+    try:
+        send(context, RECIPIENT, MESSAGE)
+        save_cookies(context, storage_state)
+    except SendError as e:
+        log(f"ERROR: {e}")
+        sys.exit(1)
+    finally:
+        context.close()
 
     log("Message sent successfully!")
 
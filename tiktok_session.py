@@ -0,0 +1,51 @@
+"""
+Logging and session-cookie loading shared by the automation scripts.
+"""
+
+import functools
+import os
+import sys
+import time
+from config import COOKIES_FILE
+from cookies_util import b64decode, load_json
+
+
+def log(msg):
+    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] {msg}")
+
+
+def cookies_from_env():
+    """True when the session is supplied by the environment (CI), not local files."""
+    return bool(os.environ.get("TIKTOK_COOKIES_FILE") or os.environ.get("TIKTOK_COOKIES_B64"))
+
+
+@functools.lru_cache(maxsize=1)
+def load_cookies():
+    """Load cookies from the decoded file or base64 env var (GitHub Actions) or local file.
+
+    TIKTOK_COOKIES_FILE (written by decode_once.py) wins over
+    TIKTOK_COOKIES_B64, since it holds the same session already decoded.
+    The parsed storage_state is cached, so repeated sends in one process
+    (see cli.py) decode it only once. Treat the result as read-only.
+    """
+    cookies_file = os.environ.get("TIKTOK_COOKIES_FILE")
+    if cookies_file and os.path.exists(cookies_file):
+        log(f"Loading cookies from {cookies_file}")
+        with open(cookies_file, "rb") as f:
+            return load_json(f.read())
+
+    cookies_b64 = os.environ.get("TIKTOK_COOKIES_B64")
+    if cookies_b64:
+        log("Loading cookies from TIKTOK_COOKIES_B64 environment variable")
+        return load_json(b64decode(cookies_b64))
+
+    if os.path.exists(COOKIES_FILE):
+        log(f"Loading cookies from {COOKIES_FILE}")
+        with open(COOKIES_FILE, "rb") as f:
+            return load_json(f.read())
+
+    log("ERROR: No cookies found.")
+    log("  Run `python login.py` first, then copy your cookies to GitHub Secrets.")
+    log("  See README for full instructions.")
+    sys.exit(1)
@@ -0,0 +1,93 @@
+"""
+Keeps Playwright and the browser profile open and sends DMs on request.
+
+Starting Playwright and Chromium is most of a send's run time. While this
+worker is running, send_message.py hands its job to it over a UNIX socket
+instead of launching a browser of its own.
+
+Usage:
+    python tiktok_worker.py          # Run in a separate terminal; Ctrl+C stops it
+
+The worker holds the browser profile, so stop it before running login.py.
+"""
+
+import os
+import socket
+import sys
+from config import WORKER_SOCKET
+from cookies_util import dump_json, load_json
+from send_message import SendError, open_context, read_all, save_cookies, send
+from tiktok_session import log
+
+
+# Seconds a client gets to send its whole job; it writes one small JSON
+# object and shuts down its side, so anything longer means it is stuck
+JOB_READ_TIMEOUT = 10
+
+
+def handle(conn, context, storage_state):
+    """Run one {"recipient": ..., "message": ...} job and reply with its outcome."""
+    conn.settimeout(JOB_READ_TIMEOUT)
+    try:
+        job = load_json(read_all(conn))
+        send(context, job["recipient"], job["message"])
+        save_cookies(context, storage_state)
+        reply = {"ok": True}
+    except SendError as e:
+        log(f"ERROR: {e}")
+        reply = {"ok": False, "error": str(e)}
+    except Exception as e:
+        log(f"ERROR: Job failed: {e!r}")
+        reply = {"ok": False, "error": repr(e)}
+    try:
+        conn.sendall(dump_json(reply))
+    except OSError as e:
+        # The client gave up (timed out or was interrupted); keep serving
+        log(f"WARNING: Could not send reply: {e!r}")
+
+
+def worker_running():
+    """True if another worker is already accepting connections on WORKER_SOCKET."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(WORKER_SOCKET)
+        except OSError:
+            return False
+    return True
+
+
+def main():
+    if os.path.exists(WORKER_SOCKET):
+        if worker_running():
+            log(f"ERROR: A worker is already running on {WORKER_SOCKET}")
+            sys.exit(1)
+        # Stale socket file left behind by a worker that died
+        os.unlink(WORKER_SOCKET)
+
+    context, storage_state = open_context()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        # Create the socket owner-only from the start; a chmod after bind
+        # would leave a window where other users could connect
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(WORKER_SOCKET)
+        finally:
+            os.umask(old_umask)
+        server.listen()
+        log(f"Worker listening on {WORKER_SOCKET}")
+        while True:
+            conn, _ = server.accept()
+            with conn:
+                handle(conn, context, storage_state)
+    except KeyboardInterrupt:
+        log("Worker stopping")
+    finally:
+        server.close()
+        if os.path.exists(WORKER_SOCKET):
+            os.unlink(WORKER_SOCKET)
+        context.close()
+
+
+if __name__ == "__main__":
+    main()